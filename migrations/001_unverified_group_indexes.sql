@@ -0,0 +1,19 @@
+-- Partial indexes over the groups still waiting for review.
+--
+-- fetch_variant_group() picks the next group with
+--   (verification_status != 'verified' OR verification_status IS NULL)
+-- optionally narrowed by chapter_name. Verified rows only ever accumulate, so
+-- indexing just the unverified ones keeps these indexes small and hot.
+-- The predicate is spelled exactly like the query filter so the planner can
+-- match it.
+--
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block; run this
+-- file with autocommit on (plain psql does).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_qb_unverified_group
+    ON question_bank (variant_group_id)
+    WHERE (verification_status != 'verified' OR verification_status IS NULL);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_qb_unverified_chapter_group
+    ON question_bank (chapter_name, variant_group_id)
+    WHERE (verification_status != 'verified' OR verification_status IS NULL);
@@ -1,13 +1,23 @@
 import streamlit as st
 import pg8000.native
+import asyncio
+import hashlib
+import threading
 import uuid
 import ssl
-import json
+import orjson
 import os
+import queue
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import List, Dict, Optional
 from pydantic import BaseModel
+from streamlit.logger import get_logger
 from google import genai
+from google.genai import errors as genai_errors
 
 # ==============================================================================
 # 1. CONFIGURATION & STYLING
@@ -36,7 +46,8 @@ st.markdown("""
         border-color: #0f9d58;
         color: #0f9d58;
     }
-    div.stButton > button[kind="primary"] {
+    div.stButton > button[kind="primary"],
+    div[data-testid="stFormSubmitButton"] > button[kind="primaryFormSubmit"] {
         background-color: #0f9d58; 
         border-color: #0f9d58;
     }
@@ -48,6 +59,10 @@ st.markdown("""
         font-size: 0.95rem;
         background-color: #f0f2f6;
     }
+    /* Answer options: side by side, wrapping on narrow screens */
+    .option-row { display: flex; flex-wrap: wrap; gap: 0.25rem 0.75rem; font-size: 0.85rem; }
+    .option-row span { flex: 1 1 8rem; color: gray; }
+    .option-row span.correct { color: green; font-weight: bold; }
 </style>
 """, unsafe_allow_html=True)
 
@@ -56,10 +71,52 @@ DB_HOST = os.getenv("DB_HOST")
 DB_USER = os.getenv("DB_USER")
 DB_NAME = os.getenv("DB_NAME")
 DB_PORT = 5432
+DB_SSL_ROOT_CERT = os.getenv("DB_SSL_ROOT_CERT")  # CA bundle; the system trust store if unset
+DB_SSL_NO_VERIFY = os.getenv("DB_SSL_NO_VERIFY") == "1"  # Explicit opt-out of certificate checks
+DB_POOL_SIZE = 4            # Idle connections kept open per password
+DB_PING_AFTER_SECONDS = 30  # Health-check connections idle longer than this
+DB_MAX_IDLE_SECONDS = 120   # Close instead of pinging after this much idle time
+DB_MAX_LIFETIME_SECONDS = 1800  # Recycle connections regardless of use after this
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = "gemini-3-flash-preview"
+AUDIT_CACHE_TTL = 3600      # Seconds a Gemini verdict is reused for an unchanged group
+GEMINI_MAX_ATTEMPTS = 4     # Tries per audit when Gemini is overloaded or rate limited
+PREFETCH_GROUPS = 3         # Upcoming groups fetched and audited ahead of the reviewer
+PREFETCH_MAX_AGE_SECONDS = 15  # Older prefetched groups are refetched rather than shown
+GROUP_ROWS_TTL = 60         # Seconds load_group_rows keeps a group's rows
+
+@st.cache_resource(show_spinner=False)
+def get_genai_client():
+    # One client per process keeps its HTTP connection pool warm across reruns
+    return genai.Client(api_key=GEMINI_API_KEY)
+
+class AsyncRunner:
+    """Runs coroutines on one long-lived event loop in a daemon thread. The
+    cached client's async HTTP session is bound to the loop it first ran on,
+    so every Gemini call has to go through the same loop."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def iterate(self, agen):
+        """Drives an async generator from the calling thread, one item at a time."""
+        while True:
+            try:
+                yield self.run(agen.__anext__())
+            except StopAsyncIteration:
+                return
+
+@st.cache_resource(show_spinner=False)
+def get_async_runner():
+    return AsyncRunner()
 
 if GEMINI_API_KEY:
-    client = genai.Client(api_key=GEMINI_API_KEY)
+    client = get_genai_client()
+    audit_runner = get_async_runner()
 
 # ==============================================================================
 # 2. SESSION STATE INIT
@@ -68,7 +125,11 @@ if "skipped_groups" not in st.session_state: st.session_state["skipped_groups"]
 if "authenticated" not in st.session_state: st.session_state["authenticated"] = False
 if "selected_chapter" not in st.session_state: st.session_state["selected_chapter"] = "All Chapters"
 if "ai_result" not in st.session_state: st.session_state["ai_result"] = None
-if "group_data" not in st.session_state: st.session_state["group_data"] = None
+if "current_group_id" not in st.session_state: st.session_state["current_group_id"] = None
+if "next_group" not in st.session_state: st.session_state["next_group"] = None
+if "audit_job" not in st.session_state: st.session_state["audit_job"] = None
+if "group_fetch" not in st.session_state: st.session_state["group_fetch"] = None
+if "pending_status" not in st.session_state: st.session_state["pending_status"] = {}
 
 class QuestionAudit(BaseModel):
     question_id: str
@@ -86,7 +147,7 @@ class AuditResponse(BaseModel):
     evaluations: List[QuestionAudit]
     detected_pairs: List[QuestionPair]
 
-@dataclass
+@dataclass(slots=True)
 class QuestionData:
     question_id: str
     stem: str
@@ -99,43 +160,148 @@ class QuestionData:
     verification_status: str 
     chapter_name: str        
 
+OPTION_KEYS = ("A", "B", "C", "D", "E")
+OPTION_KEY_INDEX = {k: i for i, k in enumerate(OPTION_KEYS)}
+OPTION_HTML = "<span class='{css}'>{key}) {text}</span>"  # one option in .option-row
+
 # ==============================================================================
 # 3. DATABASE LOGIC
 # ==============================================================================
-def get_db():
-    ssl_ctx = ssl.create_default_context()
-    ssl_ctx.check_hostname = False
-    ssl_ctx.verify_mode = ssl.CERT_NONE
-    return pg8000.native.Connection(
-        user=DB_USER, host=DB_HOST, password=st.session_state.get("db_password"), 
-        database=DB_NAME, port=DB_PORT, ssl_context=ssl_ctx
+class PooledConnection(pg8000.native.Connection):
+    """pg8000 connection that remembers its server-side prepared statements, so
+    hot statements are parsed and planned once per connection, not per call."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+        self._statements = {}
+
+    def run_prepared(self, sql, **params):
+        statement = self._statements.get(sql)
+        if statement is None:
+            statement = self._statements[sql] = self.prepare(sql)
+        return statement.run(**params)
+
+def open_connection(password, ssl_context):
+    """A newly authenticated connection, outside any pool."""
+    return PooledConnection(
+        user=DB_USER, host=DB_HOST, password=password,
+        database=DB_NAME, port=DB_PORT, ssl_context=ssl_context
     )
 
+class ConnectionPool:
+    """Keeps a few authenticated pg8000 connections alive across reruns so
+    each query doesn't pay a fresh TCP + TLS handshake."""
+
+    def __init__(self, password, ssl_context, size=DB_POOL_SIZE):
+        self.password = password
+        self.ssl_context = ssl_context
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        return open_connection(self.password, self.ssl_context)
+
+    def acquire(self):
+        while True:
+            try:
+                conn, released_at = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+
+            now = time.monotonic()
+            if (now - released_at > DB_MAX_IDLE_SECONDS
+                    or now - conn.created_at > DB_MAX_LIFETIME_SECONDS):
+                self.discard(conn)
+                continue
+
+            # Azure drops idle sockets, so ping anything that sat around for a while
+            if now - released_at > DB_PING_AFTER_SECONDS:
+                try:
+                    conn.run("SELECT 1")
+                except Exception:
+                    self.discard(conn)
+                    continue
+            return conn
+
+    def warm(self, count):
+        """Opens connections until about `count` sit idle, so the first
+        queries after login skip the handshake. Runs off the script thread."""
+        for _ in range(count - self._idle.qsize()):
+            self.release(self._connect())
+
+    def release(self, conn):
+        if time.monotonic() - conn.created_at > DB_MAX_LIFETIME_SECONDS:
+            self.discard(conn)
+            return
+        try:
+            self._idle.put_nowait((conn, time.monotonic()))
+        except queue.Full:
+            self.discard(conn)
+
+    def discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+@st.cache_resource(show_spinner=False)
+def get_ssl_context():
+    # Built once per process: creating a context reloads the CA bundle.
+    # Full verification (CERT_REQUIRED + hostname) against the given CA, or
+    # the system store when none is set, which already trusts Azure's roots
+    ssl_ctx = ssl.create_default_context(cafile=DB_SSL_ROOT_CERT)
+    if DB_SSL_NO_VERIFY:
+        ssl_ctx.check_hostname = False
+        ssl_ctx.verify_mode = ssl.CERT_NONE
+    return ssl_ctx
+
+# Keyed by password, so only a couple of recent valid ones are kept
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_pool(password):
+    return ConnectionPool(password, get_ssl_context())
+
+@contextmanager
+def get_db(pool=None):
+    """Checks a connection out of the shared pool for the duration of a block.
+    Background threads have no session state, so they pass their pool in."""
+    if pool is None:
+        pool = get_pool(st.session_state.get("db_password"))
+    conn = pool.acquire()
+    try:
+        yield conn
+    except Exception:
+        # Socket state is unknown after a failure, don't hand it out again
+        pool.discard(conn)
+        raise
+    else:
+        pool.release(conn)
+
 def try_connect(password):
+    # Always a new handshake: an idle pooled connection may have authenticated
+    # before the password was rotated or revoked. No pool is created (and the
+    # password isn't cached) until the server has accepted it.
     try:
-        st.session_state["db_password"] = password
-        conn = get_db()
-        conn.close()
-        return True, None
+        conn = open_connection(password, get_ssl_context())
     except Exception as e:
         return False, str(e)
+    st.session_state["db_password"] = password
+    # The validated connection goes to the pool for the first real query
+    get_pool(password).release(conn)
+    return True, None
 
-@st.cache_data(show_spinner=False)
-def fetch_all_chapters(_password_placeholder):
-    """Fetches unique chapter names."""
+@st.cache_data(ttl=600, show_spinner=False)
+def fetch_all_chapters():
+    """Fetches unique chapter names, as a tuple so the cached value is immutable."""
     try:
-        conn = get_db()
-        results = conn.run("SELECT DISTINCT chapter_name FROM question_bank ORDER BY chapter_name")
-        conn.close()
-        return [r[0] for r in results if r[0]]
+        with get_db() as conn:
+            results = conn.run("SELECT DISTINCT chapter_name FROM question_bank ORDER BY chapter_name")
+        return tuple(r[0] for r in results if r[0])
     except Exception:
-        return []
+        return ()
 
-@st.cache_data(show_spinner=False)
+@st.cache_data(ttl=60, show_spinner=False)
 def fetch_progress(chapter_filter):
     """Calculates verified vs total groups."""
-    conn = get_db()
-    
     where_clause = ""
     params = {}
     
@@ -143,26 +309,40 @@ def fetch_progress(chapter_filter):
         where_clause = "WHERE chapter_name = :chap"
         params['chap'] = chapter_filter
 
-    # Count Total Groups
-    total_q = f"SELECT COUNT(DISTINCT variant_group_id) FROM question_bank {where_clause}"
-    total = conn.run(total_q, **params)[0][0] or 0
-    
-    # Count Verified Groups
-    ver_clause = "WHERE verification_status = 'verified'"
-    if where_clause:
-        ver_clause += " AND chapter_name = :chap"
-    else:
-        pass 
-        
-    ver_q = f"SELECT COUNT(DISTINCT variant_group_id) FROM question_bank {ver_clause}"
-    verified = conn.run(ver_q, **params)[0][0] or 0
-    
-    conn.close()
-    return verified, total
+    # Total and verified groups in one pass over the table
+    progress_q = f"""
+        SELECT COUNT(DISTINCT variant_group_id),
+               COUNT(DISTINCT variant_group_id) FILTER (WHERE verification_status = 'verified')
+        FROM question_bank {where_clause}
+    """
 
-def fetch_variant_group(skipped_ids, chapter_filter="All Chapters"):
-    conn = get_db()
+    with get_db() as conn:
+        total, verified = conn.run_prepared(progress_q, **params)[0]
     
+    return verified or 0, total or 0
+
+# question_json fields are projected server-side; pg8000 decodes the jsonb
+# options array straight into a list, so rows need no client-side JSON parse.
+# Only a group's first row (by question_id, matching the ORDER BY of every
+# query using these columns) carries fact_text, which is all
+# parse_group_rows() reads, so the long text crosses the wire once per group.
+GROUP_COLUMNS = """
+    q.question_id, q.card_id,
+    q.question_json::jsonb ->> 'stem' AS stem,
+    q.question_json::jsonb -> 'options' AS options,
+    q.question_json::jsonb ->> 'correct_key' AS correct_key,
+    q.explanation, q.variant_type, q.role, q.status, q.verification_status, 
+    q.chapter_name,
+    CASE WHEN row_number() OVER (PARTITION BY q.variant_group_id ORDER BY q.question_id) = 1
+         THEN c.fact_text END AS fact_text,
+    q.variant_group_id
+"""
+
+def fetch_variant_groups(skipped_ids, chapter_filter="All Chapters", limit=1, pool=None,
+                         verify_group_id=None):
+    """Picks up to `limit` unverified groups in order. Returns a list of
+    (group_id, rows), fetched in a single round trip. With `verify_group_id`,
+    that group is marked verified by the same statement."""
     filters = ["(verification_status != 'verified' OR verification_status IS NULL)"]
     params = {}
     
@@ -174,114 +354,546 @@ def fetch_variant_group(skipped_ids, chapter_filter="All Chapters"):
         filters.append("variant_group_id != ALL(:skip_list)")
         params['skip_list'] = skipped_ids
 
+    verify_cte = ""
+    if verify_group_id is not None:
+        # Sibling CTEs read the pre-update snapshot, so exclude the group explicitly
+        verify_cte = """
+            verified AS (
+                UPDATE question_bank SET verification_status = 'verified'
+                WHERE variant_group_id = :verify_gid
+            ),"""
+        filters.append("variant_group_id != :verify_gid")
+        params['verify_gid'] = verify_group_id
+
     where_clause = " AND ".join(filters)
+    params['limit'] = limit
+    # A single pick needs no de-duplication: the first qualifying row in index
+    # order already names the group, so the scan can stop there
+    group_by = "GROUP BY variant_group_id" if limit > 1 else ""
     
+    # Pick the groups and pull their questions in a single round trip
     group_query = f"""
-        SELECT DISTINCT variant_group_id 
-        FROM question_bank 
-        WHERE {where_clause}
-        LIMIT 1
-    """
-    
-    group_row = conn.run(group_query, **params)
-    
-    if not group_row:
-        conn.close()
-        return None, [], None
-
-    target_group_id = group_row[0][0]
-
-    questions_query = """
-        SELECT q.question_id, q.card_id, q.question_json, q.explanation, 
-               q.variant_type, q.role, q.status, q.verification_status, 
-               q.chapter_name, c.fact_text
+        WITH {verify_cte}
+        target AS (
+            SELECT variant_group_id 
+            FROM question_bank 
+            WHERE {where_clause}
+            {group_by}
+            ORDER BY variant_group_id
+            LIMIT :limit
+        )
+        SELECT {GROUP_COLUMNS}
         FROM question_bank q
+        JOIN target t ON q.variant_group_id = t.variant_group_id
         LEFT JOIN concept_cards c ON q.card_id = c.card_id
-        WHERE q.variant_group_id = :gid 
-        ORDER BY q.question_id ASC
+        ORDER BY q.variant_group_id, q.question_id ASC
     """
-    rows = conn.run(questions_query, gid=target_group_id)
+
+    # Only a handful of distinct texts come out of the branches above, so each
+    # pooled connection ends up with one prepared statement per variant
+    with get_db(pool) as conn:
+        rows = conn.run_prepared(group_query, **params)
+
+    groups = {}
+    for row in rows:
+        groups.setdefault(row[12], []).append(row)
+    return list(groups.items())
+
+def fetch_variant_group(skipped_ids, chapter_filter="All Chapters", pool=None):
+    """Picks the next unverified group. Returns (group_id, rows), or (None, [])
+    when nothing is left."""
+    groups = fetch_variant_groups(skipped_ids, chapter_filter, pool=pool)
+    return groups[0] if groups else (None, [])
+
+@st.cache_data(ttl=GROUP_ROWS_TTL, show_spinner=False)
+def load_group_rows(group_id, _rows=None):
+    """Question rows for a group. `_rows` is left out of the cache key, so rows
+    that were already fetched can be stored under `group_id` without a query."""
+    if _rows is not None:
+        return _rows
+    with get_db() as conn:
+        return conn.run_prepared(f"""
+            SELECT {GROUP_COLUMNS}
+            FROM question_bank q
+            LEFT JOIN concept_cards c ON q.card_id = c.card_id
+            WHERE q.variant_group_id = :gid 
+            ORDER BY q.question_id ASC
+        """, gid=group_id)
+
+def parse_group_rows(rows):
+    """Builds (questions, shared_fact_text) from question rows."""
     questions = []
     shared_fact_text = "No reference fact found."
-    if rows:
-        shared_fact_text = rows[0][9]
+    if rows and rows[0][11]:
+        shared_fact_text = rows[0][11]
     for row in rows:
-        qid, c_id, q_json_str, q_expl, q_var, q_role, q_stat, q_verif, q_chap, _ = row
-        q_json = json.loads(q_json_str) if isinstance(q_json_str, str) else q_json_str
+        qid, c_id, q_stem, q_opts, q_key, q_expl, q_var, q_role, q_stat, q_verif, q_chap, _, _ = row
         
         questions.append(QuestionData(
-            question_id=qid, stem=q_json['stem'], options=q_json['options'],
-            correct_key=q_json['correct_key'], explanation=q_expl, variant_type=q_var,
+            question_id=qid, stem=q_stem, options=q_opts,
+            correct_key=q_key, explanation=q_expl, variant_type=q_var,
             role=q_role, status=q_stat, verification_status=q_verif or 'pending',
             chapter_name=q_chap
         ))
         
-    conn.close()
-    return target_group_id, questions, shared_fact_text
+    return questions, shared_fact_text
 
 def save_pairings(pairs: List[QuestionPair]):
-    conn = get_db()
-    log = []
+    # Check if pairs exist
+    if not pairs:
+        return True, "No pairs detected by AI."
+
+    pair_uuids = [str(uuid.uuid4()) for _ in pairs]
     try:
-        # Check if pairs exist
-        if not pairs:
-            return True, "No pairs detected by AI."
+        # One set-based UPDATE for every pair; question_id is a uuid column,
+        # the AI hands the ids back as strings
+        with get_db() as conn:
+            conn.run_prepared("""
+                UPDATE question_bank AS q
+                SET question_group_id = v.uid
+                FROM unnest(CAST(:uids AS uuid[]), CAST(:p_ids AS uuid[]), CAST(:b_ids AS uuid[]))
+                     AS v(uid, p_id, b_id)
+                WHERE q.question_id IN (v.p_id, v.b_id)
+            """, uids=pair_uuids,
+                 p_ids=[p.primary_id for p in pairs], b_ids=[p.backup_id for p in pairs])
 
-        for p in pairs:
-            pair_uuid = str(uuid.uuid4())
-            
-            # --- IMPORTANT: CHECK YOUR COLUMN NAME HERE ---
-            # Is it 'question_group_id' or 'question_group_id'? 
-            # I am using 'question_group_id' based on your previous code.
-            conn.run("""
-                UPDATE question_bank 
-                SET question_group_id = :uid 
-                WHERE question_id IN (:p_id, :b_id)
-            """, uid=pair_uuid, p_id=p.primary_id, b_id=p.backup_id)
-            
-            log.append(f"🔗 Linked Q{p.primary_id} + Q{p.backup_id} (Group ID: {pair_uuid[:8]}...)")
-            
-        return True, "\n\n".join(log)
+        return True, "\n\n".join(
+            f"🔗 Linked Q{p.primary_id} + Q{p.backup_id} (Group ID: {pair_uuid[:8]}...)"
+            for p, pair_uuid in zip(pairs, pair_uuids)
+        )
         
     except Exception as e:
         return False, f"❌ Database Error: {str(e)}"
-    finally:
-        conn.close()
 
 def save_edit(qid, new_json, new_expl):
-    conn = get_db()
-    conn.run("UPDATE question_bank SET question_json = :qj, explanation = :ex WHERE question_id = :qid", 
-             qj=json.dumps(new_json), ex=new_expl, qid=qid)
-    conn.close()
+    """Writes the edit and returns the stored (stem, options, correct_key, explanation)."""
+    with get_db() as conn:
+        rows = conn.run_prepared("""
+            UPDATE question_bank SET question_json = :qj, explanation = :ex WHERE question_id = :qid
+            RETURNING question_json::jsonb ->> 'stem', question_json::jsonb -> 'options',
+                      question_json::jsonb ->> 'correct_key', explanation
+        """, qj=orjson.dumps(new_json).decode(), ex=new_expl, qid=qid)
+    return rows[0] if rows else None
 
-def update_status_single(qid, new_status):
-    conn = get_db()
-    conn.run("UPDATE question_bank SET status = :s WHERE question_id = :qid", s=new_status, qid=qid)
-    conn.close()
+def patch_cached_question(group_id, qid, saved_fields):
+    """Swaps one question's saved (stem, options, correct_key, explanation)
+    into the cached group rows, so the rerun after a Save doesn't have to
+    reload the whole group."""
+    rows = load_group_rows(group_id)
+    for row in rows:
+        if row[0] == qid:
+            row[2:6] = saved_fields
+    # Re-seeding needs the entry gone first, since `_rows` isn't in the key;
+    # only this group's entry is dropped, not every session's groups
+    load_group_rows.clear(group_id)
+    load_group_rows(group_id, _rows=rows)
+
+def save_status_changes(changes):
+    """Writes queued {question_id: status} toggles on one connection, with a
+    single UPDATE per target status rather than one per question."""
+    by_status = {}
+    for qid, status in changes.items():
+        by_status.setdefault(status, []).append(qid)
+    with get_db() as conn:
+        for status, qids in by_status.items():
+            # Fixed text, so every batch size shares one prepared statement
+            conn.run_prepared(
+                "UPDATE question_bank SET status = :s WHERE question_id = ANY(CAST(:qids AS uuid[]))",
+                s=status, qids=qids)
 
 def mark_group_verified(group_id):
-    conn = get_db()
-    conn.run("UPDATE question_bank SET verification_status = 'verified' WHERE variant_group_id = :gid", gid=group_id)
-    conn.close()
+    with get_db() as conn:
+        conn.run_prepared("UPDATE question_bank SET verification_status = 'verified' WHERE variant_group_id = :gid",
+                          gid=group_id)
+
+# --- AI AUDIT ---
+# Streamlit's logger gets a console handler and follows `logger.level`; a
+# bare logging.getLogger() would have neither and drop these INFO lines
+audit_log = get_logger("audit")
+
+# Outermost JSON object, in case the model wraps it in fences or prose
+AUDIT_JSON_RE = re.compile(r"\{.*\}", re.DOTALL)
+# Innermost objects; evaluations are flat, so these are the finished ones
+AUDIT_ITEM_RE = re.compile(r"\{[^{}]*\}")
+
+# Fixed instructions go out as the system instruction; the prompt itself only
+# carries the group being audited. The JSON shape comes from the response schema.
+AUDIT_SYSTEM_PROMPT = """Audit this medical question set (FCPS Part 1). Focus ONLY on factual accuracy.
+Also, identify which Backup questions are clones of which Primary questions.
+
+The question set arrives as JSON: "fact" is the reference fact, and each entry
+in "questions" has id, role, s (stem), o (options by key), k (correct key) and
+e (explanation). Use the id as question_id in your answer.
+
+Tasks:
+1. VALIDATION: Check for factually incorrect statements, mismatches, or logic errors.
+2. PAIRING: Identify pairs of (Primary, Backup) questions that test the exact same concept.
+   - A Primary can be paired with a Backup_Clone.
+   - One Primary can only pair with one Backup_clone.
+3. Make sure you do not mix up question_id (uuid).
+
+global_summary is a short note if the verdict is FAIL, null if PASS.
+Give feedback only for questions that FAIL."""
+
+# Generated once here rather than introspected from the model on every request
+AUDIT_CONFIG = {
+    'system_instruction': AUDIT_SYSTEM_PROMPT,
+    'response_mime_type': 'application/json',
+    'response_json_schema': AuditResponse.model_json_schema(),
+}
+
+async def _generate_audit(prompt):
+    return await client.aio.models.generate_content(
+        model=GEMINI_MODEL, contents=prompt, config=AUDIT_CONFIG
+    )
+
+async def _stream_audit(prompt):
+    stream = await client.aio.models.generate_content_stream(
+        model=GEMINI_MODEL, contents=prompt, config=AUDIT_CONFIG
+    )
+    usage = None
+    async for chunk in stream:
+        usage = chunk.usage_metadata or usage
+        if chunk.text:
+            yield chunk.text
+    _log_usage(usage)
+
+async def _generate_audits(prompts):
+    return await asyncio.gather(*(_generate_audit(p) for p in prompts), return_exceptions=True)
+
+def build_audit_prompt(questions, shared_fact):
+    # Compact JSON with short keys: no field labels repeated per question,
+    # the legend lives once in AUDIT_SYSTEM_PROMPT
+    return orjson.dumps({
+        "fact": shared_fact,
+        "questions": [
+            {
+                "id": q.question_id, "role": q.role, "s": q.stem,
+                "o": {o['key']: o['text'] for o in q.options},
+                "k": q.correct_key, "e": q.explanation,
+            }
+            for q in questions
+        ],
+    }).decode()
+
+def parse_audit_text(text) -> AuditResponse:
+    text = text or ""
+    match = AUDIT_JSON_RE.search(text)
+    return AuditResponse.model_validate_json(match.group(0) if match else text)
+
+def parse_partial_evaluations(text):
+    """The evaluations that have fully arrived in a still-streaming response.
+    Anything incomplete, or not an evaluation (e.g. a detected pair), is skipped."""
+    evaluations = []
+    for match in AUDIT_ITEM_RE.finditer(text or ""):
+        try:
+            evaluations.append(QuestionAudit.model_validate_json(match.group(0)))
+        except ValueError:
+            pass
+    return evaluations
+
+def _is_transient(exc):
+    if isinstance(exc, genai_errors.ServerError):
+        return True
+    return isinstance(exc, genai_errors.ClientError) and exc.code == 429
+
+def _log_usage(usage):
+    """Logs token counts per audit; `cached` shows whether Gemini's implicit
+    caching matched the fixed system-instruction prefix."""
+    if usage is not None:
+        audit_log.info("audit tokens: prompt=%s cached=%s output=%s",
+                       usage.prompt_token_count, usage.cached_content_token_count,
+                       usage.candidates_token_count)
+
+def _parse_response(response) -> AuditResponse:
+    _log_usage(response.usage_metadata)
+    return parse_audit_text(response.text)
+
+def _request_audit(prompt, on_text):
+    if on_text is None:
+        return _parse_response(audit_runner.run(_generate_audit(prompt)))
+    # Chunks are pulled on the calling thread, which is where `on_text` runs
+    parts = []
+    for text in audit_runner.iterate(_stream_audit(prompt)):
+        parts.append(text)
+        on_text("".join(parts))
+    return parse_audit_text("".join(parts))
+
+def run_audit(prompt, on_text=None) -> AuditResponse:
+    """Sends the audit prompt through the async Gemini client. With `on_text`,
+    the response is streamed and the callback gets the text received so far.
+
+    5xx and 429 responses are retried with exponential backoff; anything else
+    (bad request, unparseable output) is raised straight to the caller."""
+    for attempt in range(GEMINI_MAX_ATTEMPTS):
+        try:
+            return _request_audit(prompt, on_text)
+        except genai_errors.APIError as e:
+            if not _is_transient(e) or attempt == GEMINI_MAX_ATTEMPTS - 1:
+                raise
+            time.sleep(2 ** attempt)
+
+class AuditCache:
+    """Process-wide store of parsed audits keyed by a hash of the prompt, so an
+    unchanged group is never sent to Gemini twice within the TTL. Audits still
+    running are tracked too, so a second request for the same prompt waits on
+    the first instead of making its own call."""
+
+    def __init__(self, ttl=AUDIT_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        self._entries.pop(key, None)
+        return None
+
+    def get(self, key):
+        with self._lock:
+            return self._get(key)
+
+    def claim(self, key):
+        """Returns None when the caller should run the audit for `key` itself,
+        and must then settle it with put() or fail(). Otherwise returns a
+        Future of the verdict: already resolved if it is cached, or resolving
+        when the audit in flight finishes."""
+        with self._lock:
+            audit = self._get(key)
+            if audit is not None:
+                done = Future()
+                done.set_result(audit)
+                return done
+            if key in self._pending:
+                return self._pending[key]
+            self._pending[key] = Future()
+            return None
+
+    def put(self, key, audit):
+        now = time.monotonic()
+        with self._lock:
+            # Drop expired entries so the store doesn't grow for the life of the process
+            for k in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+                del self._entries[k]
+            self._entries[key] = (now + self.ttl, audit)
+            pending = self._pending.pop(key, None)
+        if pending is not None:
+            pending.set_result(audit)
+
+    def fail(self, key, exc):
+        """Releases a claim whose audit failed; waiters get `exc`."""
+        with self._lock:
+            pending = self._pending.pop(key, None)
+        if pending is not None:
+            pending.set_exception(exc)
+
+@st.cache_resource(show_spinner=False)
+def get_audit_cache():
+    return AuditCache()
+
+# A verdict depends on the model and instructions as much as on the group, and
+# the cache outlives script reloads, so both go into every key
+_AUDIT_KEY_PREFIX = hashlib.blake2b(
+    GEMINI_MODEL.encode() + orjson.dumps(AUDIT_CONFIG, option=orjson.OPT_SORT_KEYS),
+    digest_size=16,
+).digest()
+
+def _audit_key(prompt):
+    return hashlib.blake2b(_AUDIT_KEY_PREFIX + prompt.encode(), digest_size=16).hexdigest()
+
+def cached_audit(prompt, cache, on_text=None) -> AuditResponse:
+    """Returns the cached verdict for this exact prompt, waits for the audit
+    already running for it, or runs a fresh one."""
+    key = _audit_key(prompt)
+    while (pending := cache.claim(key)) is not None:
+        try:
+            return pending.result()
+        except Exception:
+            pass  # That attempt failed; claim the prompt and try it here
+    try:
+        res = run_audit(prompt, on_text=on_text)
+    except BaseException as e:
+        cache.fail(key, e)
+        raise
+    cache.put(key, res)
+    return res
+
+def warm_audit_cache(prompts, cache):
+    """Audits every prompt that is neither cached nor already running,
+    concurrently, so N Gemini round trips overlap into roughly one. Failures
+    are left for the foreground to retry."""
+    claimed = [p for p in prompts if cache.claim(_audit_key(p)) is None]
+    if not claimed:
+        return
+    try:
+        responses = audit_runner.run(_generate_audits(claimed))
+    except BaseException as e:
+        for prompt in claimed:
+            cache.fail(_audit_key(prompt), e)
+        raise
+    for prompt, response in zip(claimed, responses):
+        key = _audit_key(prompt)
+        if isinstance(response, BaseException):
+            cache.fail(key, response)
+            continue
+        try:
+            cache.put(key, _parse_response(response))
+        except Exception as e:
+            cache.fail(key, e)
+
+# --- BACKGROUND PREFETCH ---
+@st.cache_resource(show_spinner=False)
+def get_executor():
+    """Gemini work: foreground audits and prefetch warming, which can sit in
+    retry backoff for seconds at a time."""
+    return ThreadPoolExecutor(max_workers=4)
+
+@st.cache_resource(show_spinner=False)
+def get_db_executor():
+    """Group fetches and pool warming, kept off get_executor() so the query
+    the page is waiting on never queues behind an LLM call."""
+    return ThreadPoolExecutor(max_workers=4)
+
+class AuditJob:
+    """The foreground audit for one group, running on the executor so the
+    questions paint and stay usable while Gemini works. `text` carries the
+    streamed output so far; the polling fragment shows it."""
+    def __init__(self, group_id, prompt, cache):
+        self.group_id = group_id
+        self.prompt = prompt
+        self.text = ""
+        self.future = get_executor().submit(cached_audit, prompt, cache, self._on_text)
+
+    def _on_text(self, text):
+        self.text = text
+
+def _warm_quietly(prompts, cache):
+    try:
+        warm_audit_cache(prompts, cache)
+    except Exception:
+        pass  # The foreground audit will retry once each group is shown
+
+def prefetch_next_group(pool, audit_cache, executor, skipped_ids, chapter_filter):
+    """Loads the next PREFETCH_GROUPS groups after the current one and returns
+    the first of them. Their audits are handed to `executor` as a separate
+    task that nothing waits on, so adopting the prefetch costs one query, not
+    a Gemini round trip. Runs off the script thread, so it must not touch
+    st.* APIs."""
+    groups = fetch_variant_groups(skipped_ids, chapter_filter, limit=PREFETCH_GROUPS, pool=pool)
+    if groups and GEMINI_API_KEY:
+        prompts = [build_audit_prompt(*parse_group_rows(rows)) for _, rows in groups]
+        executor.submit(_warm_quietly, prompts, audit_cache)
+    return groups[0] if groups else (None, [])
+
+def start_group_fetch():
+    """Starts loading the next group on the executor; the main UI waits on
+    session_state['group_fetch'] when it needs the rows."""
+    st.session_state["group_fetch"] = get_db_executor().submit(
+        fetch_variant_group,
+        list(st.session_state["skipped_groups"]),
+        st.session_state["selected_chapter"],
+        get_pool(st.session_state["db_password"]),
+    )
+
+def show_group(gid, rows, fetched_at=None):
+    """Makes `gid` the active group, seeding the row cache with rows in hand.
+    Rows older than the cache's own TTL aren't seeded: the shared entry may
+    have expired since, and they could carry text another reviewer has saved
+    over."""
+    if gid and (fetched_at is None or time.monotonic() - fetched_at < GROUP_ROWS_TTL):
+        load_group_rows(gid, _rows=rows)
+    st.session_state["current_group_id"] = gid
+
+def ready_prefetch(gid):
+    """The prefetch queued behind `gid` if it has finished and is recent
+    enough to show, else None. One still in flight is never waited on (this
+    runs in button callbacks, before any spinner can show), and an old one
+    may list groups that have been verified since."""
+    pending = st.session_state["next_group"]
+    if (not pending or pending[0] != gid or not pending[1].done()
+            or time.monotonic() - pending[2] > PREFETCH_MAX_AGE_SECONDS):
+        return None
+    return pending
+
+def advance_group(gid):
+    """Moves past `gid`, adopting the background prefetch for it when
+    ready_prefetch() allows; otherwise the next rerun fetches the group
+    itself."""
+    pending = ready_prefetch(gid)
+    clear_group_state()
+    if pending is None:
+        return
+    try:
+        show_group(*pending[1].result(), fetched_at=pending[2])
+    except Exception:
+        pass  # Fall back to a regular fetch on the next rerun
+
+def adopt_audit(res):
+    """Makes `res` the verdict for the current group and records the pairs it found."""
+    if res.detected_pairs:
+        success, log_msg = save_pairings(res.detected_pairs)
+        st.session_state["pairing_log"] = log_msg 
+        if success:
+            st.toast(f"✅ Auto-grouped {len(res.detected_pairs)} pairs!")
+        else:
+            st.toast("❌ Grouping Failed")
+    else:
+         st.session_state["pairing_log"] = "No pairs detected by AI."
+    st.session_state["ai_result"] = res
 
 def clear_group_state():
     """Helper to reset state and force a new fetch."""
-    st.session_state["group_data"] = None
+    # Work for the group being left that hasn't started yet is no longer wanted
+    job = st.session_state["audit_job"]
+    if job is not None:
+        job.future.cancel()
+    pending = st.session_state["next_group"]
+    if pending is not None:
+        pending[1].cancel()
+    if st.session_state["group_fetch"] is not None:
+        st.session_state["group_fetch"].cancel()
+    st.session_state["current_group_id"] = None
     st.session_state["ai_result"] = None
+    st.session_state["next_group"] = None
+    st.session_state["audit_job"] = None
+    st.session_state["group_fetch"] = None
+
+def flush_status_changes():
+    """Writes the toggles queued while reviewing the current group."""
+    pending = st.session_state["pending_status"]
+    if pending:
+        save_status_changes(pending)
+        st.session_state["pending_status"] = {}
+        load_group_rows.clear(st.session_state["current_group_id"])
 
 def skip_group_callback():
     gid = st.session_state.get("current_group_id")
     if gid:
+        flush_status_changes()
         st.session_state["skipped_groups"].append(gid)
-        fetch_progress.clear()
-        clear_group_state()
+        advance_group(gid)
 
 def verify_group_callback():
     gid = st.session_state.get("current_group_id")
     if gid:
-        mark_group_verified(gid)
+        flush_status_changes()
         fetch_progress.clear()
+        if ready_prefetch(gid):
+            mark_group_verified(gid)
+            advance_group(gid)
+            return
+        # Prefetch missing, still running or stale: verify and load the next
+        # group in one round trip rather than waiting on it
+        groups = fetch_variant_groups(
+            st.session_state["skipped_groups"], st.session_state["selected_chapter"],
+            verify_group_id=gid
+        )
         clear_group_state()
+        if groups:
+            show_group(*groups[0])
 
 # ==============================================================================
 # 4. LOGIN SCREEN
@@ -293,6 +905,10 @@ if not st.session_state["authenticated"]:
         valid, err = try_connect(pwd)
         if valid:
             st.session_state["authenticated"] = True
+            # Open the connections the first page needs and start loading its
+            # group while the app reruns into the main UI
+            get_db_executor().submit(get_pool(pwd).warm, 2)
+            start_group_fetch()
             st.rerun()
         else:
             st.error(err)
@@ -302,21 +918,29 @@ if not st.session_state["authenticated"]:
 # 5. MAIN UI
 # ==============================================================================
 
+# The next group doesn't depend on anything rendered above it, so start that
+# query now (unless login already did) and let it overlap the chapter and
+# progress queries
+if st.session_state["current_group_id"] is None and st.session_state["group_fetch"] is None:
+    start_group_fetch()
+
 # --- CHAPTER FILTER ---
-# Pass a dummy arg to cache_data so it knows to re-run if password changes
-all_chapters = fetch_all_chapters(st.session_state["db_password"])
+chapter_options = ("All Chapters",) + fetch_all_chapters()
 
+chap_col, refresh_col = st.columns([6, 1], vertical_alignment="bottom")
 # === FIX APPLIED HERE: ADDED KEY ARGUMENT ===
-selected_chap = st.selectbox(
+selected_chap = chap_col.selectbox(
     "📂 Filter by Chapter", 
-    ["All Chapters"] + all_chapters,
-    index=0 if st.session_state["selected_chapter"] == "All Chapters" else (["All Chapters"] + all_chapters).index(st.session_state["selected_chapter"]),
+    chapter_options,
+    index=chapter_options.index(st.session_state["selected_chapter"]) if st.session_state["selected_chapter"] in chapter_options else 0,
     key="chapter_filter_selectbox" 
 )
+refresh_col.button("🔄", help="Refresh chapter list", on_click=fetch_all_chapters.clear)
 
 if selected_chap != st.session_state["selected_chapter"]:
     st.session_state["selected_chapter"] = selected_chap
     st.session_state["skipped_groups"] = [] 
+    flush_status_changes()
     clear_group_state()
     st.rerun()
 
@@ -329,18 +953,15 @@ else:
     st.info("No groups found for this chapter.")
 
 # --- DATA LOADING WITH SPINNER ---
-if 'group_data' not in st.session_state or st.session_state.group_data is None:
+# Only the group id lives in session state; its rows come from load_group_rows' cache
+if st.session_state["current_group_id"] is None:
     with st.spinner("⏳ Fetching next question batch..."):
-        st.session_state.group_data = fetch_variant_group(
-            st.session_state["skipped_groups"], 
-            st.session_state["selected_chapter"]
-        )
+        group_fetch = st.session_state["group_fetch"]
+        st.session_state["group_fetch"] = None
+        show_group(*group_fetch.result())
         st.session_state["ai_result"] = None
 
-group_id, questions, shared_fact = st.session_state.group_data if st.session_state.group_data else (None, [], None)
-
-# Save current ID for callbacks
-st.session_state["current_group_id"] = group_id
+group_id = st.session_state["current_group_id"]
 
 if not group_id:
     st.balloons()
@@ -351,53 +972,91 @@ if not group_id:
         st.rerun()
     st.stop()
 
+questions, shared_fact = parse_group_rows(load_group_rows(group_id))
+# Queued toggles belong to this session only; the shared row cache keeps
+# what the database has until they are written
+for q in questions:
+    q.status = st.session_state["pending_status"].get(q.question_id, q.status)
+
+# Load and audit the following group while this one is being reviewed, and
+# refresh it on later reruns once it is too old for Skip / Verify to adopt
+pending = st.session_state["next_group"]
+if (not pending or pending[0] != group_id
+        or (pending[1].done() and time.monotonic() - pending[2] > PREFETCH_MAX_AGE_SECONDS)):
+    st.session_state["next_group"] = (group_id, get_db_executor().submit(
+        prefetch_next_group,
+        get_pool(st.session_state["db_password"]),
+        get_audit_cache(),
+        get_executor(),
+        st.session_state["skipped_groups"] + [group_id],
+        st.session_state["selected_chapter"],
+    ), time.monotonic())
+
 # 1. REFERENCE FACT
 with st.expander("📖 View Reference Fact", expanded=True):
     st.markdown(f"<div class='fact-box'>{shared_fact}</div>", unsafe_allow_html=True)
 
-# Placeholder map to inject AI errors later
-question_feedback_map = {}
-
 # 2. QUESTIONS LOOP
-for q in questions:
+def close_editor(qid):
+    """Leaves edit mode and drops the editor's widget state, so keys from
+    every question ever edited don't pile up in the session."""
+    for key in (f"edit_{qid}", f"stem_{qid}", f"k_{qid}", f"expl_{qid}"):
+        st.session_state.pop(key, None)
+
+@st.fragment
+def render_question_card(q, group_id, feedback=None):
+    """One question card. Edit, Cancel and Activate/Deactivate only rerun this
+    fragment; Save escalates to a full rerun because the audit must refresh."""
     with st.container(border=True):
         icon = "🔹" if q.role == "Primary" else "🔗"
         st.markdown(f"**{icon} {q.role}** • <small>{q.variant_type}</small>", unsafe_allow_html=True)
 
-        question_feedback_map[q.question_id] = st.empty()
+        if feedback:
+            st.error(f"**AI Insight:** {feedback}")
         edit_key = f"edit_{q.question_id}"
         
         if st.session_state.get(edit_key, False):
             # === EDIT MODE ===
-            new_stem = st.text_area("Vignette", q.stem, height=100, key=f"stem_{q.question_id}")
-            new_key = st.selectbox("Correct Option", ["A","B","C","D","E"], 
-                                   index=["A","B","C","D","E"].index(q.correct_key),
-                                   key=f"k_{q.question_id}")
-            new_expl = st.text_area("Explanation", q.explanation, key=f"expl_{q.question_id}")
-            
-            b1, b2 = st.columns(2)
-            if b1.button("💾 Save", key=f"sv_{q.question_id}", type="primary"):
+            # A form holds the inputs client-side, so nothing reruns until Save/Cancel
+            with st.form(f"edit_form_{q.question_id}", border=False):
+                new_stem = st.text_area("Vignette", q.stem, height=100, key=f"stem_{q.question_id}")
+                new_key = st.selectbox("Correct Option", OPTION_KEYS, 
+                                       index=OPTION_KEY_INDEX[q.correct_key],
+                                       key=f"k_{q.question_id}")
+                new_expl = st.text_area("Explanation", q.explanation, key=f"expl_{q.question_id}")
+                
+                b1, b2 = st.columns(2)
+                save_clicked = b1.form_submit_button("💾 Save", type="primary", use_container_width=True)
+                cancel_clicked = b2.form_submit_button("Cancel", use_container_width=True)
+
+            if save_clicked:
+                if (new_stem, new_key, new_expl) == (q.stem, q.correct_key, q.explanation):
+                    # Nothing changed: no write, and the current verdict still holds
+                    close_editor(q.question_id)
+                    st.rerun(scope="fragment")
                 new_json = {"stem": new_stem, "options": q.options, "correct_key": new_key}
-                save_edit(q.question_id, new_json, new_expl)
-                st.session_state[edit_key] = False
+                saved = save_edit(q.question_id, new_json, new_expl)
+                close_editor(q.question_id)
                 st.session_state["ai_result"] = None # Reset AI
-                # Refetch to update local data
-                st.session_state.group_data = fetch_variant_group(st.session_state["skipped_groups"], st.session_state["selected_chapter"])
-                st.rerun()
-            if b2.button("Cancel", key=f"cn_{q.question_id}"):
-                st.session_state[edit_key] = False
+                if saved:
+                    patch_cached_question(group_id, q.question_id, saved)
+                else:
+                    load_group_rows.clear(group_id)
                 st.rerun()
+            if cancel_clicked:
+                close_editor(q.question_id)
+                st.rerun(scope="fragment")
         else:
             # === READ MODE ===
             st.markdown(f"**Vignette:** {q.stem}")
             
-            opt_cols = st.columns(len(q.options))
-            for i, opt in enumerate(q.options):
-                with opt_cols[i]:
-                    is_correct = opt['key'] == q.correct_key
-                    color = "green" if is_correct else "gray"
-                    weight = "bold" if is_correct else "normal"
-                    st.markdown(f"<div style='color:{color}; font-weight:{weight}; font-size:0.85rem;'>{opt['key']}) {opt['text']}</div>", unsafe_allow_html=True)
+            # One element for the whole row instead of a column + markdown per option
+            options_html = "".join(
+                OPTION_HTML.format(css="correct" if opt['key'] == q.correct_key else "",
+                                   key=opt['key'], text=opt['text'])
+                for opt in q.options
+            )
+            st.markdown(f"<div class='option-row'>{options_html}</div>", unsafe_allow_html=True)
             
             with st.expander("Explanation Details"):
                 st.markdown(f"<div class='explanation-text'>{q.explanation}</div>", unsafe_allow_html=True)
@@ -405,14 +1064,49 @@ for q in questions:
             f1, f2, f3 = st.columns([1, 1, 2])
             if f1.button("✏️ Edit", key=f"ed_{q.question_id}"):
                 st.session_state[edit_key] = True
-                st.rerun()
+                st.rerun(scope="fragment")
             
             tog_text = "🚫 Deactivate" if q.status == 'active' else "✅ Activate"
             if f2.button(tog_text, key=f"tg_{q.question_id}"):
                 new_s = 'inactive' if q.status == 'active' else 'active'
-                update_status_single(q.question_id, new_s)
+                # Queued until the reviewer leaves the group, then written in one go
+                st.session_state["pending_status"][q.question_id] = new_s
+                # Fragment reruns reuse this QuestionData, so update it in place
                 q.status = new_s
-                st.rerun()
+                st.rerun(scope="fragment")
+            if q.question_id in st.session_state["pending_status"]:
+                f3.caption("⏳ Saved on Skip / Verify")
+
+# Settle the audit before the cards render, so a verdict that is already known
+# (cached, or finished while the fragment polled) shows on this same run
+audit_job = None
+audit_error = None
+if not st.session_state["ai_result"]:
+    prompt = build_audit_prompt(questions, shared_fact)
+    res = get_audit_cache().get(_audit_key(prompt))
+    if res is None:
+        audit_job = st.session_state["audit_job"]
+        if audit_job is None or audit_job.group_id != group_id or audit_job.prompt != prompt:
+            audit_job = AuditJob(group_id, prompt, get_audit_cache())
+            st.session_state["audit_job"] = audit_job
+        if audit_job.future.done():
+            st.session_state["audit_job"] = None
+            try:
+                res = audit_job.future.result()
+            except Exception as e:
+                audit_error = e
+            audit_job = None
+    if res is not None:
+        adopt_audit(res)
+
+# AI insights for failed questions, looked up by id as each card renders
+ai_result = st.session_state["ai_result"]
+ai_feedback = {}
+if ai_result:
+    ai_feedback = {str(ev.question_id): ev.feedback for ev in ai_result.evaluations if ev.status == "FAIL"}
+
+for q in questions:
+    render_question_card(q, group_id, ai_feedback.get(str(q.question_id)))
 
 # 3. GLOBAL ACTIONS
 st.divider()
@@ -427,6 +1121,21 @@ with bc2:
 # ==============================================================================
 # 6. LAZY AI INJECTION
 # ==============================================================================
+@st.fragment(run_every=1)
+def render_audit_progress(job, question_numbers):
+    """Polls the running audit once a second without rerunning the page, then
+    hands the finished result to a full rerun so the cards pick it up.
+    Verdicts are listed one by one as they finish streaming."""
+    if job.future.done():
+        st.rerun()
+    with st.status("🤖 AI Auditor is analyzing & grouping...", expanded=True):
+        for ev in parse_partial_evaluations(job.text):
+            number = question_numbers.get(str(ev.question_id), "?")
+            if ev.status == "FAIL":
+                st.error(f"**Q{number}:** {ev.feedback}")
+            else:
+                st.caption(f"✅ Q{number} passed")
+
 ai_placeholder = st.empty()
 log_placeholder = st.empty()
 
@@ -446,74 +1155,11 @@ if st.session_state["ai_result"]:
     if st.session_state["pairing_log"]:
         with log_placeholder.container():
             st.info(f"**🧩 Grouping Log:**\n\n{st.session_state['pairing_log']}")
-    
-    # Inject errors into specific question containers
-    for ev in res.evaluations:
-        if ev.status == "FAIL" and ev.question_id in question_feedback_map:
-            question_feedback_map[ev.question_id].error(f"**AI Insight:** {ev.feedback}")
 
-else:
-    # == RUN NEW AUDIT (LAZY) ==
-    with st.status("🤖 AI Auditor is analyzing & grouping...", expanded=True) as status:
-        prompt = "Audit this medical question set (FCPS Part 1). Focus ONLY on factual accuracy.\n"
-        prompt += "Also, identify which Backup questions are clones of which Primary questions.\n\n"
-        prompt += f"Reference Fact (Context): {shared_fact}\n\n"
-
-        for q in questions:
-            opts_str = ", ".join([f"{o['key']}:{o['text']}" for o in q.options])
-            prompt += f"--- QUESTION ID {q.question_id} ---\n"
-            prompt += f"Role: {q.role}\n" 
-            prompt += f"Stem: {q.stem}\nOptions: {opts_str}\nKey: {q.correct_key}\nExpl: {q.explanation}\n\n"
-
-        prompt += """
-        Tasks:
-        1. VALIDATION: Check for factually incorrect statements, mismatches, or logic errors.
-        2. PAIRING: Identify pairs of (Primary, Backup) questions that test the exact same concept.
-           - A Primary can be paired with a Backup_Clone.
-           - One Primary can only pair with one Backup_clone.
-        3. Make sure you do not mix up question_id (uuid).
-
-        OUTPUT JSON FORMAT:
-        {
-            "global_verdict": "PASS" or "FAIL",
-            "global_summary": "Short note if FAIL, null if PASS",
-            "evaluations":  [
-                { "question_id": uuid1, "status": "FAIL", "feedback": "Brief feedback." },
-                { "question_id": uuid2, "status": "PASS", "feedback": null }
-            ],
-            "detected_pairs": [
-                { "primary_id": uuid1, "backup_id": uuid2 }
-            ]
-        }
-        """
-        
-        try:
-            response = client.models.generate_content(
-                model='gemini-3-flash-preview',
-                contents=prompt,
-                config={
-                    'response_mime_type': 'application/json',
-                    'response_schema': AuditResponse,
-                }
-            )
-            res = response.parsed
-            
-            # === SAVE PAIRINGS AND CAPTURE LOG ===
-            if res.detected_pairs:
-                success, log_msg = save_pairings(res.detected_pairs)
-                st.session_state["pairing_log"] = log_msg 
-                if success:
-                    st.toast(f"✅ Auto-grouped {len(res.detected_pairs)} pairs!")
-                else:
-                    st.toast("❌ Grouping Failed")
-            else:
-                 st.session_state["pairing_log"] = "No pairs detected by AI."
-            # =====================================
-
-            st.session_state["ai_result"] = res
-            status.update(label="✅ AI Audit Complete", state="complete", expanded=False)
-            st.rerun()
+elif audit_error is not None:
+    ai_placeholder.warning("⚠️ AI Audit Failed")
+    st.error(f"AI Error: {audit_error}")
 
-        except Exception as e:
-            status.update(label="⚠️ AI Audit Failed", state="error")
-            st.error(f"AI Error: {e}")
+elif audit_job is not None:
+    # == AUDIT STILL RUNNING OFF THE SCRIPT THREAD ==
+    render_audit_progress(audit_job, {str(q.question_id): i for i, q in enumerate(questions, 1)})